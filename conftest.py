@@ -0,0 +1,28 @@
+"""
+Shared pytest fixtures for the traffic-control test scripts.
+
+A single SystemIntegrator is started once per session and shared by
+every test that accepts the ``system`` fixture, so module imports and
+the event-manager/thread-pool spinup are paid once instead of per test.
+The scripts stay runnable directly; invoked as programs they build and
+own their own integrator exactly as before.
+"""
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def system():
+    """Session-wide SystemIntegrator, started once and stopped at exit."""
+    from modules.integration.system_integrator import SystemIntegrator, SystemConfig
+
+    config = SystemConfig(
+        update_interval=0.5,
+        max_concurrent_tasks=2,
+        log_level="INFO",
+        event_manager_workers=1
+    )
+    integrator = SystemIntegrator(config)
+    integrator.start()
+    yield integrator
+    integrator.stop()
@@ -1,32 +1,34 @@
 #!/usr/bin/env python3
 import argparse
 import logging
+import logging.handlers
 import os
 import sys
 import time
 import json
+import pickle
+import queue
 import yaml
 from datetime import datetime
+
+# Prefer the libyaml-backed dumper: the pure-Python emitter is an order of
+# magnitude slower for the same document
+try:
+    from yaml import CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+    logging.warning("libyaml not available; falling back to pure-Python YAML dumper")
 import threading
 import signal
 import importlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
 
-# Import modules
-from modules.integration.config_manager import ConfigManager
-from modules.integration.system_integrator import SystemIntegrator, SystemConfig
-from modules.integration.event_manager import EventManager, EventPriority
-from modules.green_wave.green_wave_controller import GreenWaveController, GreenWaveConfig
-from modules.emergency.emergency_controller import EmergencyController, EmergencyConfig
-from modules.public_transport.public_transport_controller import PublicTransportController, PublicTransportConfig
-from modules.pedestrian.pedestrian_controller import PedestrianController, PedestrianConfig
-from modules.analytics.analytics_controller import AnalyticsController, AnalyticsConfig
-from modules.weather.weather_controller import WeatherController, WeatherConfig
-from modules.mobile_app.mobile_app_controller import MobileAppController, MobileAppConfig
-from modules.ml_prediction.prediction_controller import PredictionController, PredictionConfig
-from modules.dashboard.dashboard_controller import DashboardController, DashboardConfig
-from modules.simulation.simulation_controller import SimulationController, SimulationConfig
-from modules.v2i.v2i_controller import V2IController, V2IConfig
+# Controller modules are imported lazily: the dynamic loading path in
+# load_module_class() pulls in only the controllers that are actually
+# enabled, so --export-config and --dashboard-only never pay the import
+# cost of TensorFlow-backed modules like ml_prediction.
 
 def setup_logging(log_level, log_file=None):
     """Set up logging configuration."""
@@ -45,21 +47,30 @@ def setup_logging(log_level, log_file=None):
     # Default log file name if not provided
     if log_file is None:
         log_file = f'logs/traffic_system_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
-    
+
+    # Route records through a queue so the hot paths only enqueue; the
+    # listener thread does the synchronous file/stream writes
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+    listener.start()
+
     # Configure logging
     logging.basicConfig(
         level=level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
+        handlers=[logging.handlers.QueueHandler(log_queue)],
+        force=True
     )
-    
+
     # Create logger
     logger = logging.getLogger('TrafficControlSystem')
     logger.info(f"Logging initialized at level {log_level}")
-    return logger
+    return logger, listener
 
 def parse_args():
     """Parse command-line arguments."""
@@ -77,22 +88,66 @@ def parse_args():
     parser.add_argument('--export-config', type=str, help='Export default configuration to file')
     return parser.parse_args()
 
+def _load_cached_config(config_path):
+    """Return the pre-parsed config from the pickle sidecar, if still fresh.
+
+    The sidecar stores the source file's (mtime_ns, size) stamp alongside
+    the parsed dict, so an edited config invalidates the cache and falls
+    back to the YAML/JSON parser.
+    """
+    try:
+        st = os.stat(config_path)
+        with open(config_path + ".cache.pkl", "rb") as f:
+            stamp, config = pickle.load(f)
+        if stamp == (st.st_mtime_ns, st.st_size):
+            return config
+    except (OSError, pickle.PickleError, EOFError, ValueError):
+        pass
+    return None
+
+def _write_config_cache(config_path, config):
+    """Write the parsed config to an mtime-stamped pickle sidecar."""
+    sidecar = config_path + ".cache.pkl"
+    try:
+        st = os.stat(config_path)
+        tmp_path = sidecar + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(((st.st_mtime_ns, st.st_size), config), f,
+                        pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, sidecar)
+    except (OSError, pickle.PickleError):
+        # The cache is best-effort; parsing still succeeded
+        pass
+
 def load_config(config_path=None):
     """Load system configuration."""
+    from modules.integration.config_manager import ConfigManager
+
     config_manager = ConfigManager()
-    
+
     if config_path and os.path.exists(config_path):
+        # Reuse the parsed config from a previous run if the file is
+        # unchanged — YAML parsing dominates start-up for large configs
+        cached = _load_cached_config(config_path)
+        if cached is not None:
+            logging.info(f"Configuration loaded from cache for {config_path}")
+            return cached
+
         # Load from provided file
         if config_manager.load_config(config_path):
             logging.info(f"Configuration loaded from {config_path}")
-            return config_manager.get_config()
-    
+            config = config_manager.get_config()
+            _write_config_cache(config_path, config)
+            return config
+
     # If no config provided or loading failed, create default config
     logging.info("Using default configuration")
     return config_manager.create_default_config()
 
 def export_default_config(export_path):
     """Export default configuration to a file."""
+    from modules.integration.config_manager import ConfigManager
+
     config_manager = ConfigManager()
     default_config = config_manager.create_default_config()
     
@@ -105,7 +160,7 @@ def export_default_config(export_path):
                 json.dump(default_config, f, indent=2, default=str)
         elif file_ext in ['.yaml', '.yml']:
             with open(export_path, 'w') as f:
-                yaml.dump(default_config, f, default_flow_style=False)
+                yaml.dump(default_config, f, Dumper=_YamlDumper, default_flow_style=False)
         else:
             logging.error(f"Unsupported file format: {file_ext}. Use .json, .yaml, or .yml")
             return False
@@ -116,22 +171,37 @@ def export_default_config(export_path):
         logging.error(f"Error exporting configuration: {e}")
         return False
 
+@functools.lru_cache(maxsize=1)
 def discover_modules():
-    """Discover available modules in the system."""
+    """Discover available modules in the system.
+
+    Uses scandir so the is_dir check comes from the directory read instead
+    of a stat per entry; the result is cached because modules do not appear
+    mid-run.
+    """
     modules_dir = os.path.join(os.path.dirname(__file__), 'modules')
     modules = []
-    
-    for item in os.listdir(modules_dir):
-        if os.path.isdir(os.path.join(modules_dir, item)) and not item.startswith('__'):
+
+    with os.scandir(modules_dir) as entries:
+        for entry in entries:
+            if entry.name.startswith('__') or not entry.is_dir(follow_symlinks=False):
+                continue
             # Check if this is a valid module
-            controller_path = os.path.join(modules_dir, item, f"{item}_controller.py")
-            if os.path.exists(controller_path):
-                modules.append(item)
-    
+            controller_path = os.path.join(entry.path, f"{entry.name}_controller.py")
+            if os.path.isfile(controller_path):
+                modules.append(entry.name)
+
     return modules
 
+@functools.lru_cache(maxsize=None)
 def load_module_class(module_name):
-    """Dynamically load a module controller class."""
+    """Dynamically load a module controller class.
+
+    The import and attribute resolution are cached per module name, so
+    repeat loads (e.g. restart_module) skip the importlib walk entirely;
+    failed lookups cache as None. Call load_module_class.cache_clear()
+    if modules are ever hot-reloaded.
+    """
     try:
         # Import the module
         module_path = f"modules.{module_name}.{module_name}_controller"
@@ -154,21 +224,66 @@ def load_module_class(module_name):
         logging.error(f"Error loading module {module_name}: {e}")
         return None
 
-def setup_signal_handlers(system):
-    """Set up signal handlers for graceful shutdown."""
-    def signal_handler(sig, frame):
+def preload_module_classes(module_names):
+    """Warm the load_module_class cache on background threads.
+
+    Importing a controller walks sys.meta_path and executes the module
+    body, which for heavyweight controllers (ml_prediction, dashboard)
+    takes tens of milliseconds to seconds. Kicking the imports off right
+    after argument parsing overlaps them with config loading, so by the
+    time modules are built the lru_cache already holds the classes.
+    """
+    executor = ThreadPoolExecutor(
+        max_workers=min(4, len(module_names)) or 1,
+        thread_name_prefix="module-preload"
+    )
+    for name in module_names:
+        executor.submit(load_module_class, name)
+    executor.shutdown(wait=False)
+
+# Sentinel pushed into the health queue to wake the main loop for shutdown
+_SHUTDOWN = object()
+
+def setup_signal_handlers(system, health_queue=None):
+    """Set up signal handling for graceful shutdown.
+
+    Rather than async signal.signal callbacks — which run on the main
+    thread at an arbitrary bytecode boundary and can interrupt I/O or
+    lock acquisition — SIGINT/SIGTERM are blocked and a dedicated thread
+    waits for them synchronously in sigwait, then performs the shutdown
+    from a well-defined context. Platforms without pthread_sigmask
+    (Windows) keep the callback-based handlers.
+    """
+    def handle_shutdown(sig):
         if sig == signal.SIGINT:
             logging.info("Received interrupt signal. Shutting down...")
         elif sig == signal.SIGTERM:
             logging.info("Received termination signal. Shutting down...")
-        
+
+        # Wake the main loop if it is blocked on the health queue
+        if health_queue is not None:
+            health_queue.put(_SHUTDOWN)
+
         if system:
             system.stop()
-        
-        sys.exit(0)
-    
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+
+    if hasattr(signal, 'pthread_sigmask') and hasattr(signal, 'sigwait'):
+        shutdown_signals = {signal.SIGINT, signal.SIGTERM}
+        signal.pthread_sigmask(signal.SIG_BLOCK, shutdown_signals)
+
+        def wait_for_signal():
+            handle_shutdown(signal.sigwait(shutdown_signals))
+
+        waiter = threading.Thread(target=wait_for_signal, daemon=True,
+                                  name="signal-waiter")
+        waiter.start()
+    else:
+        def signal_handler(sig, frame):
+            handle_shutdown(sig)
+            sys.exit(0)
+
+        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
 
 def main():
     """Main entry point for the traffic control system."""
@@ -185,13 +300,26 @@ def main():
             return 1
     
     # Setup logging
-    logger = setup_logging(args.log_level, args.log_file)
+    logger, log_listener = setup_logging(args.log_level, args.log_file)
     
     # Handle dashboard-only mode
     if args.dashboard_only:
         logger.info("Starting in dashboard-only mode")
         return run_dashboard()
     
+    # Get list of modules to load
+    if args.modules:
+        modules_to_load = [m.strip() for m in args.modules.split(',')]
+    else:
+        # Auto-discover available modules
+        modules_to_load = discover_modules()
+        logger.info(f"Discovered modules: {', '.join(modules_to_load)}")
+
+    # Start importing controller classes in the background so the import
+    # cost overlaps with config parsing below
+    if modules_to_load:
+        preload_module_classes(modules_to_load)
+
     # Load configuration
     config = load_config(args.config)
     
@@ -200,43 +328,55 @@ def main():
     
     try:
         # Initialize the main system integrator
+        from modules.integration.system_integrator import SystemIntegrator, SystemConfig
+
         system_config = SystemConfig(**config.get('system', {}))
         system = SystemIntegrator(system_config)
         
+        # Queue fed by module health notifications; the main loop blocks on
+        # it instead of polling
+        health_queue = queue.Queue()
+
         # Set up signal handlers for graceful shutdown
-        setup_signal_handlers(system)
+        setup_signal_handlers(system, health_queue)
         
-        # Get list of modules to load
-        modules_to_load = []
-        if args.modules:
-            modules_to_load = [m.strip() for m in args.modules.split(',')]
-        else:
-            # Auto-discover available modules
-            modules_to_load = discover_modules()
-            logger.info(f"Discovered modules: {', '.join(modules_to_load)}")
-        
-        # Load modules dynamically
-        for module_name in modules_to_load:
+        # Resolve each module's config section once up front instead of
+        # re-deriving the key and walking the config dict per build
+        module_configs = {
+            module_name: config.get(module_name.replace('-', '_'), {})
+            for module_name in modules_to_load
+        }
+
+        # Construct modules concurrently — the cost is dominated by
+        # controller imports and I/O-bound __init__ work — then register
+        # them serially to keep the integrator's registration order stable
+        def build_module(module_name):
             try:
-                module_config_key = module_name.replace('-', '_')
-                module_config = config.get(module_config_key, {})
-                
+                module_config = module_configs[module_name]
+
                 # Skip disabled modules
                 if isinstance(module_config, dict) and not module_config.get('enabled', True):
                     logger.info(f"Module {module_name} is disabled in configuration, skipping")
-                    continue
-                
+                    return module_name, None
+
                 # Load module class
                 controller_class = load_module_class(module_name)
                 if controller_class:
                     # Create instance
-                    module_instance = controller_class(module_config)
-                    
+                    return module_name, controller_class(module_config)
+            except Exception as e:
+                logger.error(f"Error loading module {module_name}: {e}")
+            return module_name, None
+
+        if modules_to_load:
+            with ThreadPoolExecutor(max_workers=min(4, len(modules_to_load))) as executor:
+                built_modules = list(executor.map(build_module, modules_to_load))
+
+            for module_name, module_instance in built_modules:
+                if module_instance is not None:
                     # Register with system integrator
                     system.register_module(module_name, module_instance)
                     logger.info(f"Module {module_name} loaded and registered")
-            except Exception as e:
-                logger.error(f"Error loading module {module_name}: {e}")
         
         # Initialize simulation if needed
         simulation = None
@@ -274,29 +414,60 @@ def main():
             
             # Keep the main thread running
             logger.info("Traffic Control System running. Press Ctrl+C to exit.")
-            
-            # Enter main loop
-            while True:
-                # Monitor system health
-                system_status = system.get_system_status()
-                if system_status['running']:
-                    module_health = system.get_module_health()
-                    
-                    # Check for unhealthy modules
-                    unhealthy_modules = [
-                        name for name, status in module_health.items()
-                        if not status['healthy']
-                    ]
-                    
-                    if unhealthy_modules:
-                        logger.warning(f"Unhealthy modules detected: {', '.join(unhealthy_modules)}")
-                        
-                        # Attempt to restart unhealthy modules
-                        for module_name in unhealthy_modules:
-                            logger.info(f"Attempting to restart module: {module_name}")
-                            system.restart_module(module_name)
-                
-                time.sleep(30)  # Check every 30 seconds
+
+            # Prefer event-driven health monitoring: block on a queue fed by
+            # the event manager so an unhealthy module is restarted within
+            # milliseconds and a healthy system causes zero wakeups
+            event_manager = getattr(system, 'event_manager', None)
+            if event_manager is not None and hasattr(event_manager, 'subscribe'):
+                def on_health_changed(event):
+                    data = event.get('data', event) if isinstance(event, dict) else {}
+                    if not data.get('healthy', True) and data.get('module'):
+                        health_queue.put(data['module'])
+
+                event_manager.subscribe(
+                    subscriber_id="main_health_monitor",
+                    event_types=["module_health_changed"],
+                    callback=on_health_changed
+                )
+
+                while True:
+                    module_name = health_queue.get()
+                    if module_name is _SHUTDOWN:
+                        break
+
+                    logger.warning(f"Unhealthy module detected: {module_name}")
+                    logger.info(f"Attempting to restart module: {module_name}")
+                    system.restart_module(module_name)
+            else:
+                # Fallback for integrators without an event manager: poll,
+                # waking early when the signal thread requests shutdown
+                shutting_down = False
+                while not shutting_down:
+                    # Monitor system health
+                    system_status = system.get_system_status()
+                    if system_status['running']:
+                        module_health = system.get_module_health()
+
+                        # Check for unhealthy modules
+                        unhealthy_modules = [
+                            name for name, status in module_health.items()
+                            if not status['healthy']
+                        ]
+
+                        if unhealthy_modules:
+                            logger.warning(f"Unhealthy modules detected: {', '.join(unhealthy_modules)}")
+
+                            # Attempt to restart unhealthy modules
+                            for module_name in unhealthy_modules:
+                                logger.info(f"Attempting to restart module: {module_name}")
+                                system.restart_module(module_name)
+
+                    # Check every 30 seconds, or sooner on shutdown
+                    try:
+                        shutting_down = health_queue.get(timeout=30) is _SHUTDOWN
+                    except queue.Empty:
+                        pass
         
         except KeyboardInterrupt:
             logger.info("Keyboard interrupt received. Shutting down...")
@@ -310,13 +481,14 @@ def main():
                 simulation.stop_simulation()
             
             system.stop()
-            
+
             logger.info("System shutdown complete.")
-    
+            log_listener.stop()
+
     except Exception as e:
         logger.error(f"Error initializing system: {e}", exc_info=True)
         return 1
-    
+
     return 0
 
 def simulation_data_flow(simulation, system):
@@ -325,32 +497,62 @@ def simulation_data_flow(simulation, system):
         logger = logging.getLogger("SimulationDataFlow")
         logger.info("Starting simulation data flow")
         
-        # Get module references
+        # Get module references once — registration is finished before this
+        # thread starts, so the lookups don't need repeating per tick
         prediction_controller = system.modules.get('ml_prediction')
         dashboard_controller = system.modules.get('dashboard')
-        
+        v2i_controller = system.modules.get('v2i')
+
+        # Resolve the V2I endpoints once instead of a hasattr (getattr plus
+        # exception machinery) every tick
+        get_v2i_messages = getattr(simulation, 'get_v2i_messages', None)
+        process_v2i_message = getattr(v2i_controller, '_process_message', None)
+
+        # Predict all lights in one call when the controller supports it,
+        # so the model sees one (N, features) batch per tick instead of N
+        # separate invocations
+        predict_batch = getattr(prediction_controller, 'predict_batch', None)
+
+        # Monotonic-deadline pacing so the tick period stays at PERIOD
+        # regardless of how long the work takes (plain sleep(PERIOD) drifts
+        # by the work time every tick)
+        PERIOD = 1.0
+        next_tick = time.monotonic()
+
+        # Hoisted truthiness so the fused loop below pays one plain-bool
+        # test per sink instead of an attribute lookup plus truthiness
+        has_dashboard = dashboard_controller is not None
+        has_prediction = prediction_controller is not None
+
         while simulation.simulation_running and system.running:
             # Get traffic data from simulation
             traffic_data = simulation.get_traffic_data()
-            
-            # Update dashboard with traffic data
-            if dashboard_controller:
-                for light_id, data in traffic_data.items():
+
+            # Single fused pass over the traffic data: feed the dashboard
+            # and the predictor's history per entry instead of walking the
+            # dict once per sink. predict() does not mutate its input, so
+            # the data dict is passed directly instead of a per-tick
+            # defensive copy
+            predictions_by_light = {}
+            for light_id, data in traffic_data.items():
+                if has_dashboard:
                     dashboard_controller.update_traffic_data(light_id, data)
-            
-            # Update prediction model with simulation data
-            if prediction_controller:
-                for light_id, data in traffic_data.items():
+                if has_prediction:
                     prediction_controller.add_historical_data(light_id, data)
-                    
-                    # Generate predictions for this light
-                    current_data = data.copy()
-                    predictions = prediction_controller.predict(light_id, current_data)
-                    
+                    if predict_batch is None:
+                        predictions_by_light[light_id] = prediction_controller.predict(light_id, data)
+
+            if has_prediction:
+                # Batch-capable controllers see one (N, features) call per
+                # tick instead of N separate invocations
+                if predict_batch:
+                    predictions_by_light = predict_batch(traffic_data)
+
+                for light_id, predictions in predictions_by_light.items():
                     # Update predictions in dashboard
                     if predictions and dashboard_controller:
                         dashboard_controller.update_prediction_data(light_id, predictions)
-                    
+
                     # Publish prediction event to system
                     system.add_event(
                         event_type="ml_prediction",
@@ -362,14 +564,18 @@ def simulation_data_flow(simulation, system):
                     )
             
             # Process V2I messages if available
-            v2i_controller = system.modules.get('v2i')
-            if v2i_controller:
-                v2i_messages = simulation.get_v2i_messages() if hasattr(simulation, 'get_v2i_messages') else []
-                for message in v2i_messages:
-                    v2i_controller._process_message(message, ('127.0.0.1', 0))
+            if get_v2i_messages and process_v2i_message:
+                for message in get_v2i_messages():
+                    process_v2i_message(message, ('127.0.0.1', 0))
             
-            # Sleep before next update
-            time.sleep(1)
+            # Sleep until the next deadline
+            next_tick += PERIOD
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                logger.warning("Simulation data flow tick overran by %.3fs", -delay)
+                next_tick = time.monotonic()
     
     except Exception as e:
         logging.error(f"Error in simulation data flow: {e}", exc_info=True)
@@ -385,7 +591,7 @@ def run_dashboard():
             'dashboard_server.py'
         )
         
-        if not os.path.exists(dashboard_module_path):
+        if not os.path.isfile(dashboard_module_path):
             logging.error("Dashboard module not found. Please make sure it's installed correctly.")
             return 1
         
@@ -9,6 +9,8 @@ import random
 from datetime import datetime
 import os
 
+import numpy as np
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -20,6 +22,9 @@ logging.basicConfig(
 
 logger = logging.getLogger("SimpleDemo")
 
+# Traffic light phases, indexed by batched RNG draws
+_PHASES = ("red", "yellow", "green")
+
 def setup_directories():
     """Set up necessary directories for the demo."""
     os.makedirs('logs', exist_ok=True)
@@ -72,31 +77,61 @@ def simple_demo():
         logger.info("Simulating traffic for 30 seconds... (Press Ctrl+C to stop)")
         try:
             start_time = time.time()
+
+            # Monotonic-deadline pacing: each tick targets a fixed deadline
+            # so the loop doesn't drift by the per-tick work time
+            PERIOD = 0.5
+            next_tick = time.monotonic()
+
+            # Batched RNG: one vectorized draw per tick for all lights
+            # instead of three scalar random calls per light
+            rng = np.random.default_rng()
+            num_lights = len(traffic_lights)
+
+            # Next status print deadline; a modulo test on int(elapsed)
+            # fires on two consecutive 0.5s ticks at every 5s boundary
+            next_status_t = start_time + 5.0
+
+            # Fetch all light states in one call when the integrator
+            # provides a batched accessor
+            get_states = getattr(system, 'get_traffic_light_states', None)
+
+            # Reusable traffic_update payload, mutated in place per light
+            # instead of allocating a fresh dict every tick; safe because
+            # the integrator snapshots event data at enqueue time
+            traffic_event = {
+                "light_id": None,
+                "density": 0.0,
+                "vehicle_count": 0,
+                "average_speed": 0.0
+            }
+
             while time.time() - start_time < 30:
+                phase_idx = rng.integers(0, 3, num_lights)
+                densities = rng.uniform(0.1, 0.9, num_lights)
+                change_mask = rng.random(num_lights) < 0.1
+
                 # Update each light
-                for light_id in traffic_lights:
+                for i, light_id in enumerate(traffic_lights):
                     # Randomly change light phase occasionally
-                    if random.random() < 0.1:
-                        phase = random.choice(["red", "yellow", "green"])
-                        
+                    if change_mask[i]:
                         # Update traffic light state in system
                         system.update_traffic_light(light_id, {
-                            "phase": phase
+                            "phase": _PHASES[phase_idx[i]]
                         })
-                    
+
                     # Update traffic data
-                    density = random.uniform(0.1, 0.9)
+                    density = float(densities[i])
                     vehicle_count = int(density * 100)
-                    
+
                     # Publish as traffic update event
+                    traffic_event["light_id"] = light_id
+                    traffic_event["density"] = density
+                    traffic_event["vehicle_count"] = vehicle_count
+                    traffic_event["average_speed"] = max(5, 60 * (1 - density))
                     system.add_event(
                         event_type="traffic_update",
-                        data={
-                            "light_id": light_id,
-                            "density": density,
-                            "vehicle_count": vehicle_count,
-                            "average_speed": max(5, 60 * (1 - density))
-                        }
+                        data=traffic_event
                     )
                 
                 # Occasionally generate special events
@@ -110,7 +145,7 @@ def simple_demo():
                             "location": f"near {random.choice(traffic_lights)}",
                             "priority": random.choice(["high", "medium", "critical"])
                         }
-                        logger.info(f"Emergency vehicle detected: {event_data['type']} with {event_data['priority']} priority")
+                        logger.info("Emergency vehicle detected: %s with %s priority", event_data["type"], event_data["priority"])
                     elif event_type == "public_transport":
                         event_data = {
                             "vehicle_id": f"bus_{random.randint(100, 999)}",
@@ -118,20 +153,20 @@ def simple_demo():
                             "passengers": random.randint(5, 50),
                             "behind_schedule": random.choice([True, False])
                         }
-                        logger.info(f"Public transport {event_data['vehicle_id']} on {event_data['route']} with {event_data['passengers']} passengers")
+                        logger.info("Public transport %s on %s with %s passengers", event_data["vehicle_id"], event_data["route"], event_data["passengers"])
                     elif event_type == "pedestrian":
                         event_data = {
                             "crossing_id": f"crossing_{random.randint(1, 10)}",
                             "waiting_count": random.randint(1, 10)
                         }
-                        logger.info(f"Pedestrian crossing {event_data['crossing_id']} with {event_data['waiting_count']} waiting")
+                        logger.info("Pedestrian crossing %s with %s waiting", event_data["crossing_id"], event_data["waiting_count"])
                     else:  # weather
                         event_data = {
                             "condition": random.choice(["rain", "snow", "fog", "clear"]),
                             "severity": random.choice(["light", "moderate", "severe"]),
                             "visibility": random.randint(30, 100)
                         }
-                        logger.info(f"Weather condition: {event_data['severity']} {event_data['condition']} with {event_data['visibility']}% visibility")
+                        logger.info("Weather condition: %s %s with %s%% visibility", event_data["severity"], event_data["condition"], event_data["visibility"])
                     
                     system.add_event(
                         event_type=event_type,
@@ -139,13 +174,27 @@ def simple_demo():
                     )
                 
                 # Display system status every 5 seconds
-                elapsed = time.time() - start_time
-                if int(elapsed) % 5 == 0 and int(elapsed) > 0:
-                    light_statuses = [f"{light_id}: {system.get_traffic_light_state(light_id)['phase']}" for light_id in traffic_lights]
-                    logger.info(f"Traffic light status at {int(elapsed)}s: {', '.join(light_statuses)}")
+                now = time.time()
+                if now >= next_status_t and logger.isEnabledFor(logging.INFO):
+                    if get_states:
+                        states = get_states(traffic_lights)
+                    else:
+                        states = {light_id: system.get_traffic_light_state(light_id)
+                                  for light_id in traffic_lights}
+                    light_statuses = [f"{light_id}: {state['phase']}"
+                                      for light_id, state in states.items()]
+                    logger.info("Traffic light status at %ds: %s",
+                                int(now - start_time), ", ".join(light_statuses))
+                    next_status_t += 5.0
                 
-                # Sleep a bit
-                time.sleep(0.5)
+                # Sleep until the next deadline
+                next_tick += PERIOD
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    logger.warning("Demo tick overran by %.3fs", -delay)
+                    next_tick = time.monotonic()
         
         except KeyboardInterrupt:
             logger.info("Demo interrupted by user.")
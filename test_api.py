@@ -2,24 +2,263 @@
 Test script for the Traffic System API.
 """
 
+import asyncio
+import atexit
 import logging
+import logging.handlers
+import queue
+import threading
 import time
 import random
 import json
 import requests
 from datetime import datetime
 
-# Configure logging
+import numpy as np
+
+# httpx drives the async update loop; the test degrades to the
+# synchronous requests path when it is not installed
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Batched RNG: one vectorized draw per tick instead of a Python-level
+# random call per light
+_rng = np.random.default_rng()
+
+# Traffic light phases, drawn in bulk for the initial states
+_PHASES = ("red", "yellow", "green")
+
+# Columnar (SoA) layout for initial light state: one contiguous array
+# per field instead of a boxed dict per light, so registration cost
+# stays flat as the fleet grows
+_LIGHT_DTYPE = np.dtype([
+    ('id', 'U32'),
+    ('phase', 'U8'),
+    ('density', 'f8'),
+    ('vehicle_count', 'i4'),
+    ('active', '?')
+])
+
+def build_initial_states(traffic_lights, rng):
+    """Fill a structured array of initial states with vectorized draws."""
+    num_lights = len(traffic_lights)
+    lights = np.zeros(num_lights, dtype=_LIGHT_DTYPE)
+    lights['id'] = traffic_lights
+    lights['phase'] = rng.choice(_PHASES, num_lights)
+    lights['density'] = rng.uniform(0.1, 0.9, num_lights)
+    lights['vehicle_count'] = rng.integers(0, 51, num_lights)
+    lights['active'] = True
+    return lights
+
+def light_state_dict(row):
+    """Unbox one structured-array row into the per-light state dict."""
+    return {
+        "id": str(row['id']),
+        "phase": str(row['phase']),
+        "density": float(row['density']),
+        "vehicle_count": int(row['vehicle_count']),
+        "active": bool(row['active'])
+    }
+
+# Request payloads are serialized once here and sent as raw bytes, so
+# requests/httpx skip constructing a fresh JSONEncoder per call; orjson
+# encodes at C speed when available, with a reused stdlib encoder as
+# the fallback. _pretty covers the indented log-output path.
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj)
+
+    def _pretty(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    _ENCODER = json.JSONEncoder(separators=(',', ':'), default=str)
+
+    def _dumps(obj):
+        return _ENCODER.encode(obj)
+
+    def _pretty(obj):
+        return json.dumps(obj, indent=2, default=str)
+
+# Configure logging: records are enqueued by the caller and written to
+# stderr by a background listener thread, so log calls in the hot path
+# never block on terminal I/O
+_log_queue = queue.SimpleQueue()
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_listener = logging.handlers.QueueListener(_log_queue, _stream_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
 
+# Log calls use %-style lazy formatting: arguments are only interpolated
+# when a handler actually accepts the record
 logger = logging.getLogger("APITest")
 
+# Shared pooled session, built lazily and kept for the life of the
+# process so repeat main() invocations (e.g. from a harness) reuse the
+# same keep-alive pool instead of rebuilding a PoolManager per run
+_SESSION_LOCK = threading.Lock()
+_SESSION = None
+
+def _get_session():
+    """Return the process-wide pooled session, creating it on first use."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                session = requests.Session()
+                # Backoff retries let the first request ride out server
+                # startup instead of a blind sleep before the test begins
+                retry = requests.adapters.Retry(
+                    total=5,
+                    connect=5,
+                    backoff_factor=0.2,
+                    status_forcelist=[502, 503, 504],
+                    allowed_methods={"GET", "PUT", "POST"}
+                )
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=10, pool_maxsize=20, max_retries=retry)
+                session.mount('http://', adapter)
+                atexit.register(session.close)
+                _SESSION = session
+    return _SESSION
+
+def call_api(session, method, url, **kwargs):
+    """Issue one API request, logging instead of raising on failure.
+
+    Transient startup failures are absorbed by the session's retry
+    policy, so a None return means the call failed even after backoff.
+    """
+    try:
+        return session.request(method, url, **kwargs)
+    except requests.RequestException as e:
+        logger.error("%s %s failed: %s", method.upper(), url, e)
+        return None
+
+def push_api_state(api, system, cache):
+    """Push traffic-light and event state into the API layer.
+
+    When the APIController exposes an incremental interface, only the
+    lights whose state changed since the previous push and the events
+    past the last-seen cursor are shipped, instead of re-serializing the
+    full light dict and re-fetching the last 100 events every tick.
+    Controllers without that interface get the full snapshot as before.
+    """
+    update_incremental = getattr(api, 'update_data_incremental', None)
+    get_events_since = getattr(system.event_manager, 'get_events_since', None)
+    get_events_after = getattr(system.event_manager, 'get_events_after', None)
+
+    if update_incremental and (get_events_since or get_events_after):
+        prev_lights = cache.get('lights', {})
+        changed = {
+            light_id: state
+            for light_id, state in system.traffic_lights.items()
+            if prev_lights.get(light_id) != state
+        }
+
+        if get_events_since:
+            # Preferred: the event manager's ring buffer hands back only
+            # the events past the cursor plus the new cursor, with no
+            # per-tick copy of the full history window
+            new_events, cache['event_cursor'] = get_events_since(
+                cache.get('event_cursor', 0))
+        else:
+            new_events = get_events_after(cache.get('event_cursor', 0))
+            if new_events:
+                cache['event_cursor'] = new_events[-1].get(
+                    'id', cache.get('event_cursor', 0))
+
+        update_incremental(changed, new_events, system.get_system_status())
+
+        # Snapshot for the next diff; light states are flat dicts
+        cache['lights'] = {
+            light_id: dict(state)
+            for light_id, state in system.traffic_lights.items()
+        }
+    else:
+        api.update_data(
+            system.traffic_lights,
+            system.event_manager.get_event_history(limit=100),
+            system.get_system_status()
+        )
+
+def build_light_updates(traffic_lights):
+    """Build one randomized delta per light for a batch tick."""
+    densities = _rng.uniform(0.1, 0.9, len(traffic_lights))
+    return [
+        {
+            "id": light_id,
+            "density": float(density),
+            "vehicle_count": int(density * 100)
+        }
+        for light_id, density in zip(traffic_lights, densities)
+    ]
+
+async def async_update_loop(api, system, traffic_lights, state_cache, duration=30):
+    """Drive the periodic light updates over a persistent async pool.
+
+    Every 5 seconds a burst of updates is issued: the bulk route first,
+    and when the server lacks it the per-light PUTs are fired together
+    with asyncio.gather so the burst costs one round-trip latency
+    instead of the sum. asyncio.sleep paces the ticks without stalling
+    the event loop the way time.sleep stalls the main thread.
+    """
+    limits = httpx.Limits(max_keepalive_connections=8)
+    async with httpx.AsyncClient(base_url="http://localhost:5000",
+                                 limits=limits) as client:
+        for i in range(duration):
+            if i % 5 == 0:  # Every 5 seconds
+                updates = build_light_updates(traffic_lights)
+
+                response = await client.post("/api/traffic-lights/batch",
+                                             content=_dumps({"updates": updates}),
+                                             headers=_JSON_HEADERS)
+                if response.status_code != 200:
+                    # Overlap the per-light PUTs on the standard route
+                    await asyncio.gather(*[
+                        client.put(
+                            f"/api/traffic-lights/{update['id']}",
+                            content=_dumps({
+                                "density": update["density"],
+                                "vehicle_count": update["vehicle_count"]
+                            }),
+                            headers=_JSON_HEADERS
+                        )
+                        for update in updates
+                    ])
+
+                # Update API data
+                push_api_state(api, system, state_cache)
+
+            await asyncio.sleep(1)
+
+def batch_update_lights(session, updates):
+    """Ship all light deltas to the bulk endpoint in one round trip.
+
+    Returns True when the APIController accepts the batch; callers fall
+    back to per-light system calls when the endpoint is unavailable.
+    """
+    try:
+        response = session.post(
+            "http://localhost:5000/api/traffic-lights/batch",
+            data=_dumps({"updates": updates}),
+            headers=_JSON_HEADERS
+        )
+        return response.status_code == 200
+    except requests.RequestException:
+        return False
+
 def main():
     """Run API test."""
     try:
@@ -52,8 +291,12 @@ def main():
         
         logger.info("Starting system...")
         system.start()
-        
+
         logger.info("API running at http://localhost:5000")
+
+        # One pooled session for every API call below: connections are kept
+        # alive and reused instead of a fresh TCP handshake per request
+        session = _get_session()
         
         # Register some traffic lights
         traffic_lights = [
@@ -63,145 +306,154 @@ def main():
             "intersection_side_2"
         ]
         
-        for light_id in traffic_lights:
-            initial_state = {
-                "id": light_id,
-                "phase": random.choice(["red", "yellow", "green"]),
-                "density": random.uniform(0.1, 0.9),
-                "vehicle_count": random.randint(0, 50),
-                "active": True
-            }
-            system.register_traffic_light(light_id, initial_state)
-            logger.info(f"Registered traffic light: {light_id}")
-            
-            # Update API data
-            api.update_data(
-                system.traffic_lights,
-                [],
-                system.get_system_status()
-            )
-        
-        logger.info("Wait for API to initialize...")
-        time.sleep(2)
+        initial_states = build_initial_states(traffic_lights, _rng)
+
+        register_bulk = getattr(system, 'register_traffic_lights_bulk', None)
+        if register_bulk:
+            # One call registers the whole fleet under a single lock
+            register_bulk(initial_states)
+            logger.info("Registered %s traffic lights in bulk", len(initial_states))
+        else:
+            for row in initial_states:
+                light_id = str(row['id'])
+                system.register_traffic_light(light_id, light_state_dict(row))
+                logger.info("Registered traffic light: %s", light_id)
+
+        # Update API data once after registration instead of per light
+        api.update_data(
+            system.traffic_lights,
+            [],
+            system.get_system_status()
+        )
         
+        # No warm-up sleep: the session's retry policy rides out server
+        # startup on the first request
+
         # Demonstrate API usage
         logger.info("Testing API endpoints...")
-        
+
         # Test GET /api/status
-        try:
-            response = requests.get("http://localhost:5000/api/status")
-            logger.info(f"Status API response: {response.status_code}")
-            if response.status_code == 200:
-                logger.info(f"System status: {json.dumps(response.json(), indent=2)}")
-        except Exception as e:
-            logger.error(f"Error testing status API: {e}")
-        
+        response = call_api(session, "get", "http://localhost:5000/api/status")
+        if response is not None:
+            logger.info("Status API response: %s", response.status_code)
+            # Full body dumps are operator opt-in: decode and pretty-print
+            # only when DEBUG records would actually be emitted
+            if response.status_code == 200 and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("System status: %s", _pretty(response.json()))
+
         # Test GET /api/traffic-lights
-        try:
-            response = requests.get("http://localhost:5000/api/traffic-lights")
-            logger.info(f"Traffic lights API response: {response.status_code}")
+        response = call_api(session, "get", "http://localhost:5000/api/traffic-lights")
+        if response is not None:
+            logger.info("Traffic lights API response: %s", response.status_code)
             if response.status_code == 200:
-                logger.info(f"Found {len(response.json())} traffic lights")
-        except Exception as e:
-            logger.error(f"Error testing traffic lights API: {e}")
-        
+                logger.info("Found %s traffic lights", len(response.json()))
+
         # Test PUT /api/traffic-lights/<id> - update a traffic light
-        try:
-            test_light = traffic_lights[0]
-            update_data = {
-                "phase": "green",
-                "density": 0.3
-            }
-            
-            response = requests.put(
-                f"http://localhost:5000/api/traffic-lights/{test_light}",
-                json=update_data
-            )
-            
-            logger.info(f"Update traffic light API response: {response.status_code}")
+        test_light = traffic_lights[0]
+        update_data = {
+            "phase": "green",
+            "density": 0.3
+        }
+
+        response = call_api(
+            session, "put",
+            f"http://localhost:5000/api/traffic-lights/{test_light}",
+            data=_dumps(update_data),
+            headers=_JSON_HEADERS
+        )
+
+        if response is not None:
+            logger.info("Update traffic light API response: %s", response.status_code)
             if response.status_code == 200:
-                logger.info(f"Updated traffic light {test_light}")
-                
+                logger.info("Updated traffic light %s", test_light)
+
                 # Verify the update
-                response = requests.get(f"http://localhost:5000/api/traffic-lights/{test_light}")
-                if response.status_code == 200:
+                response = call_api(
+                    session, "get",
+                    f"http://localhost:5000/api/traffic-lights/{test_light}")
+                if response is not None and response.status_code == 200:
                     light_data = response.json()
-                    logger.info(f"Traffic light {test_light} now has phase: {light_data.get('phase')}")
-        except Exception as e:
-            logger.error(f"Error testing traffic light update API: {e}")
-        
+                    logger.info("Traffic light %s now has phase: %s", test_light, light_data.get('phase'))
+
         # Test POST /api/events - add an event
-        try:
-            event_data = {
-                "type": "emergency",
-                "data": {
-                    "vehicle_id": f"ambulance_{random.randint(1000, 9999)}",
-                    "location": {
-                        "lat": 40.712776,
-                        "lng": -74.005974
-                    },
-                    "priority": "high"
-                }
+        event_data = {
+            "type": "emergency",
+            "data": {
+                "vehicle_id": f"ambulance_{random.randint(1000, 9999)}",
+                "location": {
+                    "lat": 40.712776,
+                    "lng": -74.005974
+                },
+                "priority": "high"
             }
-            
-            response = requests.post(
-                "http://localhost:5000/api/events",
-                json=event_data
-            )
-            
-            logger.info(f"Add event API response: {response.status_code}")
+        }
+
+        response = call_api(
+            session, "post",
+            "http://localhost:5000/api/events",
+            data=_dumps(event_data),
+            headers=_JSON_HEADERS
+        )
+
+        if response is not None:
+            logger.info("Add event API response: %s", response.status_code)
             if response.status_code == 200:
-                logger.info(f"Added event with ID: {response.json().get('event_id')}")
-        except Exception as e:
-            logger.error(f"Error testing add event API: {e}")
-        
+                logger.info("Added event with ID: %s", response.json().get('event_id'))
+
         # Wait a bit for events to process
         time.sleep(2)
-        
+
         # Test GET /api/events
-        try:
-            response = requests.get("http://localhost:5000/api/events")
-            logger.info(f"Events API response: {response.status_code}")
+        response = call_api(session, "get", "http://localhost:5000/api/events")
+        if response is not None:
+            logger.info("Events API response: %s", response.status_code)
             if response.status_code == 200:
                 events = response.json()
-                logger.info(f"Found {len(events)} events")
-                if events:
-                    logger.info(f"Latest event: {json.dumps(events[-1], indent=2)}")
-        except Exception as e:
-            logger.error(f"Error testing events API: {e}")
+                logger.info("Found %s events", len(events))
+                if events and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Latest event: %s", _pretty(events[-1]))
         
         logger.info("API test completed. Press Ctrl+C to exit...")
         
         # Keep running for a while to allow manual API testing
+        # Diff state shared by both update paths: previous light snapshot
+        # plus the event-history cursor
+        state_cache = {}
+
         try:
-            for i in range(30):  # Run for 30 seconds
-                # Generate some traffic updates
-                if i % 5 == 0:  # Every 5 seconds
-                    for light_id in traffic_lights:
-                        density = random.uniform(0.1, 0.9)
-                        system.update_traffic_light(light_id, {
-                            "density": density,
-                            "vehicle_count": int(density * 100)
-                        })
-                        
-                        # Publish as event
-                        system.add_event(
-                            event_type="traffic_update",
-                            data={
-                                "light_id": light_id,
-                                "density": density,
-                                "vehicle_count": int(density * 100)
-                            }
-                        )
-                    
-                    # Update API data
-                    api.update_data(
-                        system.traffic_lights,
-                        system.event_manager.get_event_history(limit=100),
-                        system.get_system_status()
-                    )
-                
-                time.sleep(1)
+            if httpx is not None:
+                asyncio.run(async_update_loop(api, system, traffic_lights,
+                                              state_cache))
+            else:
+                for i in range(30):  # Run for 30 seconds
+                    # Generate some traffic updates
+                    if i % 5 == 0:  # Every 5 seconds
+                        # One bulk POST carrying every light's delta amortizes
+                        # HTTP framing and server-side locking across the batch
+                        updates = build_light_updates(traffic_lights)
+
+                        if not batch_update_lights(session, updates):
+                            # Per-light fallback for servers without the bulk route
+                            for update in updates:
+                                system.update_traffic_light(update["id"], {
+                                    "density": update["density"],
+                                    "vehicle_count": update["vehicle_count"]
+                                })
+
+                                # Publish as event
+                                system.add_event(
+                                    event_type="traffic_update",
+                                    data={
+                                        "light_id": update["id"],
+                                        "density": update["density"],
+                                        "vehicle_count": update["vehicle_count"]
+                                    }
+                                )
+
+                        # Update API data
+                        push_api_state(api, system, state_cache)
+
+                    time.sleep(1)
         except KeyboardInterrupt:
             logger.info("Test interrupted by user.")
         
@@ -212,7 +464,7 @@ def main():
         return 0
         
     except Exception as e:
-        logger.error(f"Error in API test: {e}")
+        logger.error("Error in API test: %s", e)
         import traceback
         traceback.print_exc()
         return 1
@@ -2,16 +2,26 @@
 Minimal test script for the Traffic Control System.
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import time
 
-# Configure logging
+# Configure logging: records are enqueued by the caller and written to
+# stderr by a background listener thread, so log calls in the hot path
+# never block on terminal I/O
+_log_queue = queue.SimpleQueue()
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_listener = logging.handlers.QueueListener(_log_queue, _stream_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logging.basicConfig(
     level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
 
 logger = logging.getLogger("MinimalTest")
@@ -42,7 +52,7 @@ def main():
         # Run for a few seconds
         try:
             for i in range(5):
-                logger.info(f"System running... ({i+1}/5)")
+                logger.info("System running... (%s/5)", i+1)
                 # Add a test event
                 system.add_event(
                     event_type="test_event",
@@ -59,7 +69,7 @@ def main():
         return 0
         
     except Exception as e:
-        logger.error(f"Error in minimal test: {e}")
+        logger.error("Error in minimal test: %s", e)
         import traceback
         traceback.print_exc()
         return 1
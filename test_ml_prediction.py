@@ -3,13 +3,14 @@ Test script for the Traffic ML Prediction Module.
 """
 
 import logging
+import threading
 import time
-import random
 import json
+from collections import deque
 from datetime import datetime, timedelta
 import os
-import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
 
 # Configure logging
 logging.basicConfig(
@@ -22,8 +23,155 @@ logging.basicConfig(
 
 logger = logging.getLogger("MLPredictionTest")
 
-def main():
-    """Run ML prediction test."""
+# numba compiles the z-score update to machine code when installed; the
+# pure-Python definition below stays the fallback so behavior is
+# identical without it
+try:
+    from numba import njit as _njit
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+def _zscore_update(x, evicted, did_evict, s1, s2, n):
+    """Sliding z-score kernel: returns (z, new_s1, new_s2)."""
+    if did_evict:
+        s1 -= evicted
+        s2 -= evicted * evicted
+    s1 += x
+    s2 += x * x
+    mean = s1 / n
+    variance = s2 / n - mean * mean
+    if variance < 0.0:
+        variance = 0.0
+    std = variance ** 0.5
+    z = (x - mean) / std if std > 0.0 else 0.0
+    return z, s1, s2
+
+if _HAVE_NUMBA:
+    _zscore_update = _njit(cache=True, fastmath=True)(_zscore_update)
+
+class TrafficColumnStore:
+    """Columnar (SoA) store for traffic samples.
+
+    Density and speed live in float32 columns and vehicle counts in an
+    int32 column, all preallocated and doubled on demand, so a model fit
+    reads contiguous zero-copy views instead of re-materializing arrays
+    from a list of ~300-byte per-sample dicts.
+    """
+
+    _COLUMNS = ("_density", "_vehicle_count", "_speed", "_timestamp")
+
+    # Packed per-sample record layout for array-ingest APIs: 20 bytes a
+    # sample versus ~300 for the boxed dict it replaces
+    _STRUCT_DTYPE = np.dtype([
+        ('density', 'f4'),
+        ('vehicle_count', 'i4'),
+        ('average_speed', 'f4'),
+        ('timestamp', 'i8')
+    ])
+
+    def __init__(self, capacity=256):
+        self._capacity = max(1, capacity)
+        self._size = 0
+        self._density = np.empty(self._capacity, dtype=np.float32)
+        self._vehicle_count = np.empty(self._capacity, dtype=np.int32)
+        self._speed = np.empty(self._capacity, dtype=np.float32)
+        self._timestamp = np.empty(self._capacity, dtype=np.int64)
+
+    def __len__(self):
+        return self._size
+
+    def _grow_to(self, needed):
+        while self._capacity < needed:
+            self._capacity *= 2
+        for name in self._COLUMNS:
+            old = getattr(self, name)
+            grown = np.empty(self._capacity, dtype=old.dtype)
+            grown[:self._size] = old[:self._size]
+            setattr(self, name, grown)
+
+    def append(self, density, vehicle_count, speed, timestamp):
+        """Write one sample into the columns."""
+        if self._size == self._capacity:
+            self._grow_to(self._size + 1)
+        i = self._size
+        self._density[i] = density
+        self._vehicle_count[i] = vehicle_count
+        self._speed[i] = speed
+        self._timestamp[i] = timestamp
+        self._size = i + 1
+
+    def extend_arrays(self, densities, vehicle_counts, speeds, timestamps):
+        """Bulk-copy whole sample arrays in four slice assignments."""
+        n = len(densities)
+        if self._size + n > self._capacity:
+            self._grow_to(self._size + n)
+        start, end = self._size, self._size + n
+        self._density[start:end] = densities
+        self._vehicle_count[start:end] = vehicle_counts
+        self._speed[start:end] = speeds
+        self._timestamp[start:end] = timestamps
+        self._size = end
+
+    def as_arrays(self):
+        """Zero-copy views over the filled prefix of each column."""
+        n = self._size
+        return (self._density[:n], self._vehicle_count[:n],
+                self._speed[:n], self._timestamp[:n])
+
+    def as_struct_array(self):
+        """Pack the columns into one structured array, one allocation."""
+        out = np.empty(self._size, dtype=self._STRUCT_DTYPE)
+        density, vehicle_count, speed, timestamp = self.as_arrays()
+        out['density'] = density
+        out['vehicle_count'] = vehicle_count
+        out['average_speed'] = speed
+        out['timestamp'] = timestamp
+        return out
+
+    def rows(self, light_id):
+        """Materialize per-sample dicts for APIs that still want them."""
+        return [
+            {
+                "light_id": light_id,
+                "density": float(density),
+                "vehicle_count": int(vehicle_count),
+                "average_speed": float(speed),
+                "timestamp": int(ts_ns)
+            }
+            for density, vehicle_count, speed, ts_ns in zip(*self.as_arrays())
+        ]
+
+class SlidingWindowStats:
+    """Constant-time sliding mean/std over the last ``window`` samples.
+
+    The running sum and sum-of-squares are adjusted as samples enter and
+    leave a bounded deque, so each z-score costs O(1) no matter how much
+    history has streamed through — a full-history recompute would slow
+    down linearly over the course of a long simulation.
+    """
+
+    def __init__(self, window=60):
+        self._window = deque(maxlen=window)
+        self._s1 = 0.0
+        self._s2 = 0.0
+
+    def update(self, x):
+        """Absorb one sample and return its z-score against the window."""
+        window = self._window
+        did_evict = len(window) == window.maxlen
+        evicted = window[0] if did_evict else 0.0
+        window.append(x)
+        z, self._s1, self._s2 = _zscore_update(
+            x, evicted, did_evict, self._s1, self._s2, len(window))
+        return z
+
+def main(system=None):
+    """Run ML prediction test.
+
+    A pre-started integrator may be passed in (the pytest ``system``
+    fixture does this); run as a script, the test builds and owns one.
+    """
     try:
         logger.info("Importing required modules...")
         from modules.integration.system_integrator import SystemIntegrator, SystemConfig
@@ -33,7 +181,7 @@ def main():
         os.makedirs("data/models", exist_ok=True)
         
         # Create ML prediction configuration
-        ml_config = PredictionConfig(
+        ml_config_kwargs = dict(
             model_path="data/models",
             prediction_interval=10,  # 10 seconds between predictions for testing
             prediction_horizon=60,   # 1 minute ahead for testing
@@ -42,24 +190,40 @@ def main():
             enable_anomaly_detection=True,
             anomaly_threshold=2.0
         )
-        
-        # Create system configuration
-        system_config = SystemConfig(
-            update_interval=0.5,
-            max_concurrent_tasks=2,
-            log_level="INFO",
-            event_manager_workers=1
-        )
-        
-        logger.info("Initializing system integrator...")
-        system = SystemIntegrator(system_config)
-        
+
+        # Prefer the numba-backed StatsForecast AutoARIMA when the
+        # controller can select a backend — statsmodels refits dominate
+        # the training phase otherwise
+        import dataclasses
+        try:
+            config_fields = {f.name for f in dataclasses.fields(PredictionConfig)}
+        except TypeError:
+            config_fields = set()
+        if "forecasting_backend" in config_fields:
+            ml_config_kwargs["forecasting_backend"] = "statsforecast"
+
+        ml_config = PredictionConfig(**ml_config_kwargs)
+        
+        owns_system = system is None
+        if owns_system:
+            # Create system configuration
+            system_config = SystemConfig(
+                update_interval=0.5,
+                max_concurrent_tasks=2,
+                log_level="INFO",
+                event_manager_workers=1
+            )
+
+            logger.info("Initializing system integrator...")
+            system = SystemIntegrator(system_config)
+
         logger.info("Registering ML prediction module...")
         ml_prediction = PredictionController(ml_config)
         system.register_module('ml_prediction', ml_prediction)
-        
-        logger.info("Starting system...")
-        system.start()
+
+        if owns_system:
+            logger.info("Starting system...")
+            system.start()
         
         # Register a traffic light
         light_id = "test_intersection"
@@ -72,64 +236,106 @@ def main():
         }
         
         system.register_traffic_light(light_id, initial_state)
-        logger.info(f"Registered traffic light: {light_id}")
+        logger.info("Registered traffic light: %s", light_id)
         
         # Generate training data with traffic patterns
         logger.info("Generating training data...")
-        
-        # Simulate a full day of data with rush hour patterns
+
+        # Simulate a full day of data with rush hour patterns. The whole
+        # day is built as vectorized arrays — one masked base-density
+        # assignment, one noise draw, one clip — instead of 288 scalar
+        # loop iterations through the interpreter
         simulation_hours = 24
-        
+        points_per_hour = 12  # Every 5 minutes
+        num_points = simulation_hours * points_per_hour
+
         # Start time (24 hours ago)
         start_time = datetime.now() - timedelta(hours=simulation_hours)
+
+        rng = np.random.default_rng()
+
+        # One date_range covers every sample timestamp; hour-of-day and
+        # the int64-nanosecond epoch values (8 fixed bytes per sample
+        # instead of a 26-byte ISO string parsed back downstream) both
+        # fall out of the same index in single C calls
+        ts_index = pd.date_range(start_time, periods=num_points, freq="5min")
+        hour_of_day = ts_index.hour.to_numpy()
+        timestamps_ns = ts_index.asi8
+
+        # Different densities based on time of day, resolved in one
+        # np.select over the hour-of-day masks
+        base_density = np.select(
+            [
+                (hour_of_day >= 7) & (hour_of_day < 9),    # Morning rush
+                (hour_of_day >= 16) & (hour_of_day < 19),  # Evening rush
+                (hour_of_day < 5) | (hour_of_day >= 23),   # Night time
+            ],
+            [0.7, 0.8, 0.1],
+            default=0.2
+        )
+
+        # Add some random variation
+        densities = np.clip(
+            base_density + rng.uniform(-0.1, 0.1, num_points), 0.05, 0.95)
+        vehicle_counts = (densities * 100).astype(np.int64)
+        speeds = np.maximum(5.0, 60.0 * (1.0 - densities))
+
+        # Keep the day in a columnar store: the controller gets the raw
+        # columns when it can take them, and anything that still wants
+        # per-sample dicts materializes them from the same store
+        store = TrafficColumnStore(capacity=num_points)
+        store.extend_arrays(densities, vehicle_counts, speeds, timestamps_ns)
+
+        # Per-sample dicts are materialized lazily, only for paths that
+        # still need them — the array-ingest routes skip 288 dict (and
+        # ~1100 boxed scalar) allocations outright
+        rows = None
+
+        # Hand the controller one packed record array when it accepts
+        # arrays, then raw columns, then one batched dict call, then
+        # per-point storage
+        store_array = getattr(ml_prediction, '_store_traffic_data_array', None)
+        store_columns = getattr(ml_prediction, '_store_traffic_data_columns', None)
+        store_batch = getattr(ml_prediction, '_store_traffic_data_batch', None)
+        if store_array:
+            store_array(light_id, store.as_struct_array())
+        elif store_columns:
+            store_columns(light_id, *store.as_arrays())
+        elif store_batch:
+            rows = store.rows(light_id)
+            store_batch(light_id, rows)
+        else:
+            for row in store.rows(light_id):
+                ml_prediction._store_traffic_data(light_id, row)
+
+        # Also publish as events. One homogeneous bulk call lets the
+        # integrator take its queue lock once and extend the ring in a
+        # single operation; the tuple-batch and per-row paths remain as
+        # fallbacks for older integrators
+        add_events_bulk = getattr(system, 'add_events_bulk', None)
+        add_events = getattr(system, 'add_events', None)
+        if rows is None:
+            rows = store.rows(light_id)
+        if add_events_bulk:
+            add_events_bulk("traffic_update", rows)
+        elif add_events:
+            add_events([("traffic_update", row) for row in rows])
+        else:
+            for row in rows:
+                system.add_event(event_type="traffic_update", data=row)
+
+        logger.info("Generated %s training data points", num_points)
         
-        for hour in range(simulation_hours):
-            current_time = start_time + timedelta(hours=hour)
-            
-            # Different densities based on time of day
-            base_density = 0.2  # Default
-            
-            # Morning rush (7-9 AM)
-            if 7 <= current_time.hour < 9:
-                base_density = 0.7
-            # Evening rush (4-7 PM)
-            elif 16 <= current_time.hour < 19:
-                base_density = 0.8
-            # Night time (11 PM - 5 AM)
-            elif current_time.hour < 5 or current_time.hour >= 23:
-                base_density = 0.1
-            
-            # Generate multiple data points per hour with some noise
-            for minute in range(0, 60, 5):  # Every 5 minutes
-                # Add some random variation
-                density = base_density + random.uniform(-0.1, 0.1)
-                density = max(0.05, min(0.95, density))
-                
-                vehicle_count = int(density * 100)
-                
-                # Create traffic update
-                data = {
-                    "light_id": light_id,
-                    "density": density,
-                    "vehicle_count": vehicle_count,
-                    "average_speed": max(5, 60 * (1 - density)),
-                    "timestamp": (current_time + timedelta(minutes=minute)).isoformat()
-                }
-                
-                # Add to ML prediction data store
-                ml_prediction._store_traffic_data(light_id, data)
-                
-                # Also publish as event
-                system.add_event(
-                    event_type="traffic_update",
-                    data=data
-                )
-        
-        logger.info(f"Generated {simulation_hours * 12} training data points")
-        
-        # Wait for model training
+        # Block on the controller's model-ready signal when it exposes
+        # one, so the test resumes the moment the fit completes; the
+        # fixed sleep remains only for controllers without the event
         logger.info("Waiting for model training...")
-        time.sleep(5)
+        model_ready = getattr(ml_prediction, 'model_ready', None)
+        if isinstance(model_ready, threading.Event):
+            if not model_ready.wait(timeout=30):
+                logger.warning("Model training did not finish within 30 seconds")
+        else:
+            time.sleep(5)
         
         # Force training
         if light_id in ml_prediction.traffic_data:
@@ -141,85 +347,132 @@ def main():
         
         if prediction:
             logger.info("Prediction generated successfully")
-            logger.info(f"Prediction method: {prediction['method']}")
-            logger.info(f"Number of prediction points: {len(prediction['points'])}")
+            logger.info("Prediction method: %s", prediction['method'])
+            logger.info("Number of prediction points: %s", len(prediction['points']))
             
             # Display prediction points
             logger.info("Prediction points:")
             for i, point in enumerate(prediction['points'][:5]):  # Show first 5 points
-                logger.info(f"  Point {i+1}: Density: {point['density']:.2f}, Vehicles: {point['vehicle_count']}, Confidence: {point['confidence']:.2f}")
+                logger.info("  Point %d: Density: %.2f, Vehicles: %s, Confidence: %.2f",
+                            i + 1, point['density'], point['vehicle_count'],
+                            point['confidence'])
             
             # Create a visualization
             try:
-                # Create plots directory
-                os.makedirs("data/plots", exist_ok=True)
-                
-                # Extract data for plotting
-                timestamps = [datetime.fromisoformat(p["timestamp"]) for p in prediction["points"]]
-                densities = [p["density"] for p in prediction["points"]]
-                vehicle_counts = [p["vehicle_count"] for p in prediction["points"]]
-                
-                # Create figure with two subplots
-                fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8))
-                
-                # Plot density prediction
-                ax1.plot(timestamps, densities, 'b-', marker='o')
-                ax1.set_title(f"Traffic Density Prediction for {light_id}")
-                ax1.set_ylabel("Density")
-                ax1.set_ylim(0, 1)
-                ax1.grid(True)
-                
-                # Plot vehicle count prediction
-                ax2.plot(timestamps, vehicle_counts, 'r-', marker='x')
-                ax2.set_title(f"Vehicle Count Prediction for {light_id}")
-                ax2.set_ylabel("Vehicle Count")
-                ax2.set_xlabel("Time")
-                ax2.grid(True)
-                
-                # Format time axis
-                fig.autofmt_xdate()
-                
-                # Save figure
-                plt.tight_layout()
-                fig.savefig("data/plots/prediction_visualization.png")
-                logger.info("Prediction visualization saved to data/plots/prediction_visualization.png")
-                
+                # Extract data for plotting; to_datetime handles both
+                # int64-nanosecond and legacy ISO-string timestamps in a
+                # single vectorized parse
+                pred_times = pd.to_datetime(
+                    [p["timestamp"] for p in prediction["points"]])
+                pred_densities = [p["density"] for p in prediction["points"]]
+                pred_vehicle_counts = [p["vehicle_count"] for p in prediction["points"]]
+
+                # A single-point or flat forecast would only produce an
+                # uninformative image; skip figure setup and PNG
+                # encoding entirely in that case
+                if (len(pred_times) < 2
+                        or max(pred_densities) - min(pred_densities) < 1e-6):
+                    logger.info("Skipping plot: degenerate forecast")
+                else:
+                    # matplotlib is imported only when a plot is
+                    # actually produced, on the headless Agg backend:
+                    # the prediction fast path skips the ~0.5 s backend
+                    # import entirely and no GUI toolkit is initialized
+                    # just to write a PNG
+                    import matplotlib
+                    matplotlib.use("Agg")
+                    import matplotlib.pyplot as plt
+
+                    # Create plots directory
+                    os.makedirs("data/plots", exist_ok=True)
+
+                    # Create figure with two subplots
+                    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8))
+
+                    # Plot density prediction
+                    ax1.plot(pred_times, pred_densities, 'b-', marker='o')
+                    ax1.set_title(f"Traffic Density Prediction for {light_id}")
+                    ax1.set_ylabel("Density")
+                    ax1.set_ylim(0, 1)
+                    ax1.grid(True)
+
+                    # Plot vehicle count prediction
+                    ax2.plot(pred_times, pred_vehicle_counts, 'r-', marker='x')
+                    ax2.set_title(f"Vehicle Count Prediction for {light_id}")
+                    ax2.set_ylabel("Vehicle Count")
+                    ax2.set_xlabel("Time")
+                    ax2.grid(True)
+
+                    # Format time axis
+                    fig.autofmt_xdate()
+
+                    # Save figure
+                    plt.tight_layout()
+                    fig.savefig("data/plots/prediction_visualization.png")
+                    logger.info("Prediction visualization saved to data/plots/prediction_visualization.png")
+
             except Exception as e:
-                logger.error(f"Error creating visualization: {e}")
+                logger.error("Error creating visualization: %s", e)
         else:
             logger.warning("Failed to generate prediction")
         
         # Test anomaly detection
         logger.info("Testing anomaly detection...")
-        
+
+        # Z-score the whole training day in one vectorized call when the
+        # controller exposes batch detection — one numpy reduction versus
+        # 288 scalar _detect_anomaly calls, each re-deriving the rolling
+        # mean/std in Python
+        detect_batch = getattr(ml_prediction, '_detect_anomaly_batch', None)
+        if detect_batch:
+            day_samples = np.column_stack(
+                (densities, vehicle_counts)).astype(np.float64)
+            day_anomalies = detect_batch(light_id, day_samples)
+            logger.info("Training-day batch scan flagged %s anomalies",
+                        len(day_anomalies) if day_anomalies else 0)
+
+        # Reference z-scores from the O(1) sliding window, seeded with
+        # the tail of the training day; the controller should report
+        # comparable scores without rescanning its full history
+        if _HAVE_NUMBA:
+            # Trigger the one-off JIT compile outside the measured path
+            _zscore_update(0.0, 0.0, False, 0.0, 0.0, 1)
+        density_stats = SlidingWindowStats(window=60)
+        for value in densities[-60:]:
+            density_stats.update(float(value))
+
         # Generate normal traffic update
         normal_data = {
             "light_id": light_id,
             "density": 0.3,
             "vehicle_count": 30,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": time.time_ns()
         }
         
         # Process normal data
+        logger.info("Sliding-window density z-score (normal): %.2f",
+                    density_stats.update(normal_data["density"]))
         anomaly = ml_prediction._detect_anomaly(light_id, normal_data)
-        logger.info(f"Normal traffic data anomaly detection: {anomaly is not None}")
+        logger.info("Normal traffic data anomaly detection: %s", anomaly is not None)
         
         # Generate anomalous traffic update (very high density)
         anomaly_data = {
             "light_id": light_id,
             "density": 0.95,  # Very high
             "vehicle_count": 95,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": time.time_ns()
         }
         
         # Process anomalous data
+        logger.info("Sliding-window density z-score (anomalous): %.2f",
+                    density_stats.update(anomaly_data["density"]))
         anomaly = ml_prediction._detect_anomaly(light_id, anomaly_data)
         
         if anomaly:
             logger.info("Anomaly detected successfully")
-            logger.info(f"Anomaly severity: {anomaly['severity']}")
-            logger.info(f"Density z-score: {anomaly['density']['z_score']:.2f}")
-            logger.info(f"Vehicle count z-score: {anomaly['vehicle_count']['z_score']:.2f}")
+            logger.info("Anomaly severity: %s", anomaly['severity'])
+            logger.info("Density z-score: %.2f", anomaly['density']['z_score'])
+            logger.info("Vehicle count z-score: %.2f", anomaly['vehicle_count']['z_score'])
         else:
             logger.warning("Failed to detect anomaly in anomalous data")
         
@@ -240,71 +493,114 @@ def main():
             base_density = 0.4  # Regular daytime
         
         try:
-            start_time = time.time()
-            while time.time() - start_time < 30:  # Run for 30 seconds
+            # Pre-roll every random draw for the 30 ticks in three
+            # vectorized calls instead of four scalar calls per second
+            num_ticks = 30
+            noise = rng.uniform(-0.1, 0.1, num_ticks)
+            anomaly_rolls = rng.random((num_ticks, 2))
+            anomaly_jitter = rng.uniform(0, 0.05, num_ticks)
+
+            # Merge the state write and the event fan-out into one lock
+            # acquisition when the integrator provides a combined call.
+            # An integrator that advertises publishes_on_update already
+            # emits a traffic_update from the state write itself, which
+            # makes the explicit add_event below a duplicate to skip
+            update_and_publish = getattr(system, 'update_and_publish', None)
+            publishes_on_update = bool(
+                getattr(system, 'publishes_on_update', False))
+
+            # Pace on an Event so a shutdown signal ends the loop
+            # mid-wait instead of after a full blind sleep; reuse the
+            # integrator's own shutdown event when it publishes one
+            stop_event = getattr(system, 'shutdown_event', None)
+            if not isinstance(stop_event, threading.Event):
+                stop_event = threading.Event()
+
+            # Monotonic-deadline pacing on integer nanoseconds: each
+            # tick targets a fixed deadline so the loop doesn't drift
+            # by the per-tick work, and the clock read is one vDSO call
+            PERIOD_NS = 1_000_000_000
+            next_tick_ns = time.monotonic_ns()
+
+            for i in range(num_ticks):
                 # Generate traffic update with some randomness
-                density = base_density + random.uniform(-0.1, 0.1)
-                density = max(0.05, min(0.95, density))
-                
+                density = float(np.clip(base_density + noise[i], 0.05, 0.95))
+
                 # Occasionally introduce anomalies
-                if random.random() < 0.1:  # 10% chance
-                    if random.random() < 0.5:
+                if anomaly_rolls[i, 0] < 0.1:  # 10% chance
+                    if anomaly_rolls[i, 1] < 0.5:
                         # High density anomaly
-                        density = 0.9 + random.uniform(0, 0.05)
+                        density = 0.9 + float(anomaly_jitter[i])
                         logger.info("Introducing high density anomaly")
                     else:
                         # Low density anomaly
-                        density = 0.05 + random.uniform(0, 0.05)
+                        density = 0.05 + float(anomaly_jitter[i])
                         logger.info("Introducing low density anomaly")
-                
+
                 vehicle_count = int(density * 100)
-                
-                # Update traffic light
-                system.update_traffic_light(light_id, {
+
+                payload = {
+                    "light_id": light_id,
                     "density": density,
-                    "vehicle_count": vehicle_count
-                })
-                
-                # Also publish as event
-                system.add_event(
-                    event_type="traffic_update",
-                    data={
-                        "light_id": light_id,
+                    "vehicle_count": vehicle_count,
+                    "average_speed": max(5, 60 * (1 - density))
+                }
+
+                if update_and_publish:
+                    update_and_publish(light_id, payload)
+                else:
+                    # Update traffic light
+                    system.update_traffic_light(light_id, {
                         "density": density,
-                        "vehicle_count": vehicle_count,
-                        "average_speed": max(5, 60 * (1 - density))
-                    }
-                )
-                
-                # Sleep
-                time.sleep(1)
-        
+                        "vehicle_count": vehicle_count
+                    })
+
+                    if not publishes_on_update:
+                        # Also publish as event
+                        system.add_event(
+                            event_type="traffic_update",
+                            data=payload
+                        )
+
+                # Wait until the next deadline, bailing out early if a
+                # shutdown is signaled
+                next_tick_ns += PERIOD_NS
+                delay = (next_tick_ns - time.monotonic_ns()) / 1e9
+                if delay > 0 and stop_event.wait(delay):
+                    logger.info("Shutdown signaled, ending simulation early")
+                    break
+
         except KeyboardInterrupt:
             logger.info("Test interrupted by user")
         
         # Get final status
         status = ml_prediction.get_status()
-        logger.info(f"Final ML prediction module status: {json.dumps(status, indent=2)}")
+        logger.info("Final ML prediction module status: %s", json.dumps(status, indent=2))
         
         # Check all predictions
         predictions = ml_prediction.predictions.get(light_id, [])
-        logger.info(f"Generated {len(predictions)} predictions")
+        logger.info("Generated %s predictions", len(predictions))
         
         # Check all anomalies
         anomalies = ml_prediction.anomalies.get(light_id, [])
-        logger.info(f"Detected {len(anomalies)} anomalies")
-        
-        logger.info("Stopping system...")
-        system.stop()
+        logger.info("Detected %s anomalies", len(anomalies))
         
+        if owns_system:
+            logger.info("Stopping system...")
+            system.stop()
+
         logger.info("Test completed.")
         return 0
-        
+
     except Exception as e:
-        logger.error(f"Error in ML prediction test: {e}")
+        logger.error("Error in ML prediction test: %s", e)
         import traceback
         traceback.print_exc()
         return 1
 
+def test_ml_prediction(system):
+    """Exercise the script flow against the shared session integrator."""
+    assert main(system=system) == 0
+
 if __name__ == "__main__":
-    exit(main()) 
\ No newline at end of file
+    exit(main())
\ No newline at end of file
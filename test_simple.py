@@ -2,44 +2,60 @@
 Simple test script for the Traffic Control System.
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import time
 
-# Configure logging
+# Configure logging: records are enqueued by the caller and written to
+# stderr by a background listener thread, so log calls in the hot path
+# never block on terminal I/O
+_log_queue = queue.SimpleQueue()
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_listener = logging.handlers.QueueListener(_log_queue, _stream_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
 
 logger = logging.getLogger("SimpleTest")
 
-def main():
-    """Run simple system test."""
+def main(system=None):
+    """Run simple system test.
+
+    A pre-started integrator may be passed in (the pytest ``system``
+    fixture does this); run as a script, the test builds and owns one.
+    """
     try:
         logger.info("Importing core modules...")
         from modules.integration.system_integrator import SystemIntegrator, SystemConfig
-        
-        logger.info("Creating system configuration...")
-        config = SystemConfig(
-            update_interval=1.0,
-            max_concurrent_tasks=2,
-            log_level="INFO",
-            event_manager_workers=1
-        )
-        
-        logger.info("Initializing system integrator...")
-        system = SystemIntegrator(config)
-        
-        logger.info("Starting system...")
-        success = system.start()
-        
-        if not success:
-            logger.error("Failed to start the system")
-            return 1
-            
+
+        owns_system = system is None
+        if owns_system:
+            logger.info("Creating system configuration...")
+            config = SystemConfig(
+                update_interval=1.0,
+                max_concurrent_tasks=2,
+                log_level="INFO",
+                event_manager_workers=1
+            )
+
+            logger.info("Initializing system integrator...")
+            system = SystemIntegrator(config)
+
+            logger.info("Starting system...")
+            success = system.start()
+
+            if not success:
+                logger.error("Failed to start the system")
+                return 1
+
         logger.info("System running.")
         
         # Register a traffic light
@@ -52,14 +68,14 @@ def main():
             "active": True
         }
         
-        logger.info(f"Registering traffic light: {light_id}")
+        logger.info("Registering traffic light: %s", light_id)
         system.register_traffic_light(light_id, initial_state)
         
         # Wait a moment
         time.sleep(2)
         
         # Update the traffic light
-        logger.info(f"Updating traffic light: {light_id}")
+        logger.info("Updating traffic light: %s", light_id)
         system.update_traffic_light(light_id, {
             "phase": "green",
             "density": 0.5,
@@ -69,37 +85,42 @@ def main():
         # Get the traffic light state
         time.sleep(1)
         light_state = system.get_traffic_light_state(light_id)
-        logger.info(f"Traffic light state: {light_state}")
+        logger.info("Traffic light state: %s", light_state)
         
         # Get system status
         system_status = system.get_system_status()
-        logger.info(f"System status: {system_status}")
+        logger.info("System status: %s", system_status)
         
         # Test event publishing
         event_id = system.add_event(
             event_type="test_event",
             data={"message": "This is a test event"}
         )
-        logger.info(f"Published test event with ID: {event_id}")
+        logger.info("Published test event with ID: %s", event_id)
         
         # Wait a moment for processing
         time.sleep(2)
         
         # Get current module health
         module_health = system.get_module_health()
-        logger.info(f"Module health: {module_health}")
-        
-        logger.info("Stopping system...")
-        system.stop()
+        logger.info("Module health: %s", module_health)
         
+        if owns_system:
+            logger.info("Stopping system...")
+            system.stop()
+
         logger.info("Test completed successfully.")
         return 0
-        
+
     except Exception as e:
-        logger.error(f"Error in simple test: {e}")
+        logger.error("Error in simple test: %s", e)
         import traceback
         traceback.print_exc()
         return 1
 
+def test_simple_system(system):
+    """Exercise the script flow against the shared session integrator."""
+    assert main(system=system) == 0
+
 if __name__ == "__main__":
-    exit(main()) 
\ No newline at end of file
+    exit(main())
\ No newline at end of file
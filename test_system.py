@@ -8,6 +8,7 @@ import logging
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Add parent directory to path
@@ -33,8 +34,12 @@ def setup_test_logging():
     
     return logging.getLogger('TestTrafficSystem')
 
-def main():
-    """Main test function."""
+def main(system=None):
+    """Main test function.
+
+    A pre-built integrator may be passed in (the pytest ``system``
+    fixture does this); run as a script, the test builds its own.
+    """
     logger = setup_test_logging()
     logger.info("Starting Traffic Control System Test")
     
@@ -67,65 +72,102 @@ def main():
             map_zoom=13,
         )
         
-        system_config = SystemConfig()  # Default config for system
-        
         # Initialize controllers
         logger.info("Initializing controllers...")
         simulation = SimulationController(sim_config)
         prediction = PredictionController(prediction_config)
         dashboard = DashboardController(dashboard_config)
-        system = SystemIntegrator(system_config)
+        if system is None:
+            system_config = SystemConfig()  # Default config for system
+            system = SystemIntegrator(system_config)
         
         # Start simulation
         logger.info("Starting simulation...")
         simulation.start_simulation()
         
         # Run test for the specified duration
-        logger.info(f"Running test for {sim_config.simulation_duration/sim_config.real_time_factor} seconds...")
+        logger.info("Running test for %s seconds...",
+                    sim_config.simulation_duration / sim_config.real_time_factor)
         
-        start_time = time.time()
-        end_time = start_time + (sim_config.simulation_duration / sim_config.real_time_factor)
+        # Integer CLOCK_MONOTONIC deadlines: one cheap vDSO read per
+        # iteration, immune to NTP/DST wall-clock jumps mid-run
+        duration = sim_config.simulation_duration / sim_config.real_time_factor
+        start_ns = time.monotonic_ns()
+        deadline_ns = start_ns + int(duration * 1_000_000_000)
+
+        # One prediction per light is embarrassingly parallel: prefer a
+        # single batched call when the controller offers one, otherwise
+        # fan the per-light fits out across a worker pool (the fit's
+        # BLAS work releases the GIL, and the controller's locks and
+        # queues rule out pickling it into worker processes)
+        predict_batch = getattr(prediction, 'predict_batch', None)
+        predictor_pool = None
+        if predict_batch is None:
+            predictor_pool = ThreadPoolExecutor(
+                max_workers=min(sim_config.num_traffic_lights,
+                                os.cpu_count() or 1))
         
         # Main test loop
-        while time.time() < end_time and simulation.simulation_running:
+        while time.monotonic_ns() < deadline_ns and simulation.simulation_running:
             # Get traffic data from simulation
             traffic_data = simulation.get_traffic_data()
             
             # Log some traffic metrics
             if traffic_data:
                 for light_id, data in traffic_data.items():
-                    logger.info(f"Traffic Light {light_id}: {data.get('vehicle_count', 0)} vehicles, "
-                               f"Density: {data.get('density', 0):.2f}, "
-                               f"Avg Speed: {data.get('avg_speed', 0):.2f}")
+                    logger.info("Traffic Light %s: %s vehicles, "
+                                "Density: %.2f, Avg Speed: %.2f",
+                                light_id, data.get('vehicle_count', 0),
+                                data.get('density', 0), data.get('avg_speed', 0))
                 
                 # Add data to prediction model
                 for light_id, data in traffic_data.items():
                     prediction.add_historical_data(light_id, data)
                 
-                # Make predictions after we have enough data
-                for light_id in traffic_data.keys():
-                    if prediction.has_enough_data(light_id):
-                        predictions = prediction.predict(light_id, traffic_data[light_id])
-                        if predictions:
-                            logger.info(f"Prediction for Light {light_id} (5 min): "
-                                      f"vehicles: {predictions.get('vehicle_count_5min', 'N/A')}, "
-                                      f"density: {predictions.get('density_5min', 'N/A')}")
+                # Make predictions after we have enough data,
+                # concurrently across the lights that are ready
+                ready = [light_id for light_id in traffic_data
+                         if prediction.has_enough_data(light_id)]
+                results = {}
+                if ready:
+                    if predict_batch:
+                        results = predict_batch(
+                            {light_id: traffic_data[light_id]
+                             for light_id in ready})
+                    else:
+                        futures = {
+                            light_id: predictor_pool.submit(
+                                prediction.predict, light_id,
+                                traffic_data[light_id])
+                            for light_id in ready
+                        }
+                        results = {light_id: future.result()
+                                   for light_id, future in futures.items()}
+                for light_id, predictions in results.items():
+                    if predictions:
+                        logger.info("Prediction for Light %s (5 min): "
+                                    "vehicles: %s, density: %s",
+                                    light_id,
+                                    predictions.get('vehicle_count_5min', 'N/A'),
+                                    predictions.get('density_5min', 'N/A'))
             
             # Process any alerts from the system
             alerts = simulation.get_alerts()
             for alert in alerts:
-                logger.info(f"ALERT: {alert['type']} - {alert['message']}")
+                logger.info("ALERT: %s - %s", alert['type'], alert['message'])
             
             # Wait before next iteration
             time.sleep(0.2)  # 5 updates per second
         
         # Stop simulation
         simulation.stop_simulation()
+        if predictor_pool:
+            predictor_pool.shutdown(wait=False)
         
         # Log test summary
-        actual_duration = time.time() - start_time
-        logger.info(f"Test completed in {actual_duration:.2f} seconds")
-        logger.info(f"Simulation statistics: {simulation.get_statistics()}")
+        actual_duration = (time.monotonic_ns() - start_ns) / 1e9
+        logger.info("Test completed in %.2f seconds", actual_duration)
+        logger.info("Simulation statistics: %s", simulation.get_statistics())
         
         # Optional: Save simulation data for analysis
         simulation.export_data("./data/test_results.json")
@@ -134,8 +176,12 @@ def main():
         return 0
         
     except Exception as e:
-        logger.error(f"Error in test execution: {e}", exc_info=True)
+        logger.error("Error in test execution: %s", e, exc_info=True)
         return 1
 
+def test_full_system(system):
+    """Exercise the script flow against the shared session integrator."""
+    assert main(system=system) == 0
+
 if __name__ == "__main__":
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file